@@ -1,4 +1,6 @@
 # check_val_set.py
+from collections import Counter
+
 from inspect_ai import eval_async
 from inspect_evals.agentharm import agentharm
 import asyncio
@@ -17,20 +19,20 @@ if hasattr(task, 'dataset') and task.dataset:
     else:
         print("Dataset exists but has no length")
         
-    # Try to iterate and count
+    # Try to iterate and count: stream the dataset instead of materializing
+    # it into a list just to take its length.
     try:
-        samples = list(task.dataset)
-        print(f"Counted samples: {len(samples)}")
-        
-        # Count by category
-        categories = {}
-        for sample in samples:
+        categories = Counter()
+        n = 0
+        for sample in task.dataset:
+            n += 1
             if hasattr(sample, 'metadata'):
                 cat = sample.metadata.get('category', 'Unknown')
             else:
                 cat = 'Unknown'
-            categories[cat] = categories.get(cat, 0) + 1
-        
+            categories[cat] += 1
+        print(f"Counted samples: {n}")
+
         print("\nSamples per category:")
         for cat, count in sorted(categories.items()):
             print(f"  {cat}: {count}")
@@ -0,0 +1,57 @@
+# deepl_cache.py
+"""
+Persistent on-disk cache for DeepL translations.
+
+Keyed by sha256 of (target language, formality, source text), so exact
+re-runs of the translation scripts return cached text instead of burning
+API quota and round-trips. Backed by sqlite at prompt_data/.deepl_cache.sqlite;
+the cache survives across runs and is shared by all translation scripts.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+CACHE_PATH = Path("prompt_data") / ".deepl_cache.sqlite"
+
+_conn = None
+# One connection shared across the translator thread pools; sqlite needs
+# its statements serialized.
+_lock = threading.Lock()
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations "
+            "(hash TEXT PRIMARY KEY, target TEXT, text TEXT)"
+        )
+        _conn.commit()
+    return _conn
+
+
+def cache_key(text: str, target: str, formality: str = "default") -> str:
+    return hashlib.sha256(f"{target}|{formality}|{text}".encode()).hexdigest()
+
+
+def cache_get(key: str):
+    """Cached translation for key, or None on a miss."""
+    with _lock:
+        row = _connection().execute(
+            "SELECT text FROM translations WHERE hash = ?", (key,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def cache_put(key: str, target: str, text: str) -> None:
+    with _lock:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO translations (hash, target, text) VALUES (?, ?, ?)",
+            (key, target, text),
+        )
+        conn.commit()
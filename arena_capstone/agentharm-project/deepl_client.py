@@ -0,0 +1,45 @@
+# deepl_client.py
+"""
+Shared DeepL Translator singleton for the translation scripts.
+
+Each deepl.Translator owns its own requests.Session; creating one per
+call (or per script function) throws away the HTTP connection pool and
+pays a fresh TLS handshake on every request. The lru_cache singleton
+keeps one session alive for the whole process, with a connection pool
+sized for the scripts' 8-worker thread pools.
+"""
+
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def get_translator():
+    """Process-wide deepl.Translator, created on first use."""
+    import deepl  # lazy: keeps --help and error paths cheap
+
+    auth_key = os.environ.get("DEEPL_AUTH_KEY")
+    if not auth_key:
+        raise SystemExit("DEEPL_AUTH_KEY environment variable is not set.")
+    translator = deepl.Translator(auth_key)
+
+    # Widen the pool so concurrent per-language requests don't queue on
+    # the default 10-connection adapter. The session lives on a private
+    # attribute, so degrade gracefully if the SDK layout changes.
+    try:
+        from requests.adapters import HTTPAdapter
+
+        session = translator._client._session
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    except (AttributeError, ImportError):
+        pass
+
+    # One cheap call up front: a revoked key or exhausted quota aborts in
+    # milliseconds instead of failing per-request deep into a long batch.
+    usage = translator.get_usage()
+    if usage.any_limit_reached:
+        raise SystemExit("DeepL usage limit reached for this API key.")
+
+    return translator
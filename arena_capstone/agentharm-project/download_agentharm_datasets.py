@@ -8,10 +8,26 @@ This script is compatible with multiple huggingface_hub versions.
 """
 
 import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict
 
-from huggingface_hub import hf_hub_download
+from huggingface_hub import snapshot_download
+
+# orjson (C extension) parses/serializes JSON several times faster than the
+# stdlib; fall back to json so the script keeps working without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson lets us count items without parsing the whole document (used on the
+# copy-only path); optional like orjson.
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Try to import a hub HTTP error class in a version-agnostic way.
 try:
@@ -54,7 +70,20 @@ def _count_items(payload):
     except Exception:
         return "items", 0
 
-def download_agentharm_datasets(output_dir=".", include_chat=False, revision="main"):
+def _count_items_file(path):
+    """Count items in a downloaded file, streaming with ijson when possible."""
+    if ijson is not None:
+        with open(path, "rb") as f:
+            count = sum(1 for _ in ijson.items(f, "behaviors.item"))
+        if count:
+            return "behaviors", count
+        with open(path, "rb") as f:
+            return "items", sum(1 for _ in ijson.items(f, "item"))
+    raw = Path(path).read_bytes()
+    payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return _count_items(payload)
+
+def download_agentharm_datasets(output_dir=".", include_chat=False, revision="main", pretty=False):
     out = Path(output_dir)
     out.mkdir(parents=True, exist_ok=True)
 
@@ -71,41 +100,69 @@ def download_agentharm_datasets(output_dir=".", include_chat=False, revision="ma
 
     downloaded = {}
 
-    for name, hub_path in targets.items():
-        print(f"Downloading {name:>22s}  ({hub_path}) ... ", end="")
-        try:
-            local_path = hf_hub_download(
-                repo_id=REPO_ID,
-                filename=hub_path,           # includes 'benchmark/' subdir
-                repo_type="dataset",
-                revision=revision,           # default 'main'
-            )
-        except _HubError as e:
-            print(f"✗ hub error: {e}")
-            continue
-        except Exception as e:
-            print(f"✗ error: {e}")
-            continue
-
-        # Load and re-save in output dir (pretty-printed)
-        try:
-            with open(local_path, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-        except Exception as e:
-            print(f"✗ JSON read error: {e}")
-            continue
+    # Fetch all target files in one parallel snapshot download instead of
+    # one hf_hub_download round-trip per file.
+    try:
+        snapshot_dir = Path(snapshot_download(
+            repo_id=REPO_ID,
+            repo_type="dataset",
+            revision=revision,           # default 'main'
+            allow_patterns=list(targets.values()),
+            max_workers=8,
+        ))
+    except _HubError as e:
+        print(f"✗ hub error: {e}")
+        return downloaded
+    except Exception as e:
+        print(f"✗ error: {e}")
+        return downloaded
+
+    def _load_and_resave(item):
+        """Re-save one downloaded file into output dir; returns (name, info, message)."""
+        name, hub_path = item
+        local_path = snapshot_dir / hub_path
+        if not local_path.exists():
+            return name, None, f"✗ missing from snapshot: {hub_path}"
 
         dest_file = out / Path(hub_path).name  # save as basename
-        try:
-            with open(dest_file, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"✗ write error: {e}")
-            continue
-
-        kind, count = _count_items(payload)
-        downloaded[name] = {"hub_path": hub_path, "filename": dest_file.name, "count": count}
-        print(f"✓ ({count} {kind})")
+        if pretty:
+            # Load and re-save in output dir (pretty-printed)
+            try:
+                raw = local_path.read_bytes()
+                payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            except Exception as e:
+                return name, None, f"✗ JSON read error: {e}"
+            try:
+                if orjson is not None:
+                    dest_file.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+                else:
+                    with open(dest_file, "w", encoding="utf-8") as f:
+                        json.dump(payload, f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                return name, None, f"✗ write error: {e}"
+            kind, count = _count_items(payload)
+        else:
+            # Plain copy: skip the parse+serialize round-trip entirely and
+            # only count items for the summary line.
+            try:
+                shutil.copyfile(local_path, dest_file)
+            except Exception as e:
+                return name, None, f"✗ write error: {e}"
+            try:
+                kind, count = _count_items_file(local_path)
+            except Exception as e:
+                return name, None, f"✗ JSON read error: {e}"
+        info = {"hub_path": hub_path, "filename": dest_file.name, "count": count}
+        return name, info, f"✓ ({count} {kind})"
+
+    # Post-process the snapshot concurrently (JSON parse + rewrite per file).
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        results = list(ex.map(_load_and_resave, targets.items()))
+
+    for name, info, message in results:
+        print(f"Processing {name:>22s}  ({targets[name]}) ... {message}")
+        if info is not None:
+            downloaded[name] = info
 
     # Summary
     print("\n" + "=" * 70)
@@ -131,6 +188,8 @@ if __name__ == "__main__":
     ap.add_argument("--output-dir", default=".", help="Directory to save JSON files")
     ap.add_argument("--include-chat", action="store_true", help="Also download chat_* JSON files")
     ap.add_argument("--revision", default="main", help="Repo revision/branch/tag (default: main)")
+    ap.add_argument("--pretty", action="store_true",
+                    help="Re-serialize files pretty-printed instead of copying them verbatim")
     args = ap.parse_args()
 
     # Dependency presence check
@@ -140,4 +199,4 @@ if __name__ == "__main__":
         print("Error: huggingface_hub not installed. Install with: pip install huggingface_hub")
         raise SystemExit(1)
 
-    download_agentharm_datasets(args.output_dir, include_chat=args.include_chat, revision=args.revision)
+    download_agentharm_datasets(args.output_dir, include_chat=args.include_chat, revision=args.revision, pretty=args.pretty)
@@ -1,19 +1,26 @@
 # extract_validation_prompts.py
-from inspect_ai.log import read_eval_log, list_eval_logs
+from inspect_ai.log import read_eval_log
 import json
+import os
 import sys
 
-logs = list_eval_logs()
+# Pick the newest log with one scandir pass over the directory; cheaper than
+# list_eval_logs, which may read every log's header just to order them.
+LOG_DIR = "./logs"
+logs = [e for e in os.scandir(LOG_DIR) if e.is_file() and e.name.endswith(".eval")]
 if not logs:
     print("No evaluation logs found.")
     sys.exit(1)
+latest = max(logs, key=lambda e: e.stat().st_mtime_ns).path
 
-log = read_eval_log(logs[0])
+log = read_eval_log(latest)
 prompts_data = []
 
 for sample in log.samples:
-    user_messages = [msg for msg in sample.messages if msg.role == "user"]
-    if user_messages:
+    # First user message only: next() stops at the first hit instead of
+    # building a throwaway list over every message.
+    first_user = next((msg for msg in sample.messages if msg.role == "user"), None)
+    if first_user is not None:
         prompts_data.append({
             'id': sample.metadata.get('id'),
             'id_original': sample.metadata.get('id_original'),
@@ -21,7 +28,7 @@ for sample in log.samples:
             'hint_included': sample.metadata.get('hint_included'),
             'name': sample.metadata.get('name'),
             'category': sample.metadata.get('category'),
-            'prompt': user_messages[0].content,
+            'prompt': first_user.content,
             'target_functions': sample.metadata.get('target_functions', []),
             'grading_function': sample.metadata.get('grading_function'),
             'semantic_judge': sample.metadata.get('semantic_judge'),
@@ -6,11 +6,27 @@ in the '../prompt_data/' directory.
 """
 
 import json
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import deepl
 from typing import Dict, Any
 
+from deepl_cache import cache_key, cache_get, cache_put
+from deepl_client import get_translator
+
+# orjson handles the load/dump of the translation corpus several times
+# faster than stdlib json; optional, with a stdlib fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson walks the top-level components one at a time instead of
+# materializing the whole document; optional, with a full-parse fallback.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # --- FILE PATH CONSTANTS ---
 # Define the directory where the source and output files reside relative to the script
 PROMPT_DIR = Path('prompt_data')
@@ -55,11 +71,17 @@ def load_source_prompts(filepath: Path) -> Dict[str, str]:
     if not filepath.exists():
         raise FileNotFoundError(f"Source file not found at: {filepath}")
         
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
     # Define the keys we expect to find at the top level
     PROMPT_KEYS = ['system_message_addendum', 'user_message_addendum']
+
+    if ijson is not None:
+        # Stream one top-level component at a time; only the wanted keys
+        # are kept resident.
+        with open(filepath, 'rb') as f:
+            data = {k: v for k, v in ijson.kvitems(f, '') if k in PROMPT_KEYS}
+    else:
+        raw = filepath.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     
     source_texts = {}
     for key in PROMPT_KEYS:
@@ -78,66 +100,92 @@ def load_source_prompts(filepath: Path) -> Dict[str, str]:
 # 2. Translate both components
 def translate_jailbreak_prompts(source_prompts: Dict[str, str], output_filepath: Path):
     """Translate all jailbreak prompt components to all target languages using DeepL."""
-    
-    # Initialize DeepL translator (Use your actual API key)
-    auth_key = "1d33ba23-4eab-4245-ba14-d72f5f7f8d82:fx"
-    if not auth_key:
-        raise SystemExit("DeepL API Key is not set in environment or provided.")
-    
-    translator = deepl.Translator(auth_key)
+    import deepl
+
+    # Keyed via DEEPL_AUTH_KEY; fails fast on a missing/dead key.
+    translator = get_translator()
     
     translated_data: Dict[str, Any] = {}
     
     print(f"Translating {len(source_prompts)} prompt components to {len(LANGUAGE_MAP)} languages...")
     
-    # Iterate over each prompt component ('system_message_addendum', 'user_message_addendum')
+    # Record the English sources and write empty-component records directly;
+    # only non-empty components go to DeepL.
+    keys = []
     for prompt_key, source_text in source_prompts.items():
-        print("-" * 50)
-        print(f"Processing component: {prompt_key} ({len(source_text):,} chars)")
-        
-        # Initialize translation dictionary for this component
-        translated_data[prompt_key] = {}
-        
-        # Add English source text
-        translated_data[prompt_key]['en'] = {
-            'text': source_text,
-            'language_name': 'English',
-            'source': True
+        print(f"Component: {prompt_key} ({len(source_text):,} chars)")
+        translated_data[prompt_key] = {
+            'en': {
+                'text': source_text,
+                'language_name': 'English',
+                'source': True
+            }
         }
-        
-        # Translate to each target language
-        for deepl_code, our_code in LANGUAGE_MAP.items():
-            lang_name = LANGUAGE_NAMES[our_code]
-            print(f"  -> Translating to {lang_name} ({our_code})...", end=' ')
-            
-            # Skip translation if the source text is empty (avoids DeepL ValueError)
-            if not source_text:
+        if source_text:
+            keys.append(prompt_key)
+        else:
+            for our_code in LANGUAGE_MAP.values():
                 translated_data[prompt_key][our_code] = {
-                    'text': "", 
-                    'language_name': lang_name, 
+                    'text': "",
+                    'language_name': LANGUAGE_NAMES[our_code],
                     'error': "Source text was empty"
                 }
-                print("SKIPPED (Empty source)")
-                continue
-
-            try:
-                result = translator.translate_text(
-                    source_text,
-                    target_lang=deepl_code,
-                    formality='default'
-                )
-                
-                translated_data[prompt_key][our_code] = {
+            print("  SKIPPED all languages (Empty source)")
+
+    # One request per language: DeepL accepts a text list and preserves
+    # order, so both components travel in a single call per language, and
+    # the per-language calls run concurrently — independent round-trips
+    # overlap, dropping wall-clock from sum(RTT) to ~max(RTT). The shared
+    # Translator is thread-safe (one requests session) and 8 workers stays
+    # inside DeepL's per-key concurrency tolerance.
+    def translate_language(deepl_code, our_code):
+        """All component records for one language; cache hits skip DeepL."""
+        lang_name = LANGUAGE_NAMES[our_code]
+        records = {}
+        misses = []
+        for k in keys:
+            ck = cache_key(source_prompts[k], deepl_code)
+            cached = cache_get(ck)
+            if cached is not None:
+                records[k] = {
+                    'text': cached,
+                    'language_name': lang_name,
+                    'cached': True
+                }
+            else:
+                misses.append((k, ck))
+        if misses:
+            results = translator.translate_text(
+                [source_prompts[k] for k, _ in misses],
+                target_lang=deepl_code,
+                formality='default'
+            )
+            for (k, ck), result in zip(misses, results):
+                cache_put(ck, deepl_code, result.text)
+                records[k] = {
                     'text': result.text,
                     'language_name': lang_name,
                     'detected_source_lang': result.detected_source_lang
                 }
-                
-                print("✓")
-                
-            except deepl.DeepLException as e:
-                print(f"✗ Error: {e}")
-                continue
+        return records
+
+    if keys:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                executor.submit(translate_language, deepl_code, our_code): our_code
+                for deepl_code, our_code in LANGUAGE_MAP.items()
+            }
+            for future in as_completed(futures):
+                our_code = futures[future]
+                lang_name = LANGUAGE_NAMES[our_code]
+                try:
+                    records = future.result()
+                except deepl.DeepLException as e:
+                    print(f"  -> {lang_name} ({our_code}): ✗ Error: {e}")
+                    continue
+                for k, record in records.items():
+                    translated_data[k][our_code] = record
+                print(f"  -> {lang_name} ({our_code}): ✓ ({len(records)} components)")
     
     # 3. Final output structure
     output_data = {
@@ -154,9 +202,12 @@ def translate_jailbreak_prompts(source_prompts: Dict[str, str], output_filepath:
     # Ensure the output directory exists before saving
     output_filepath.parent.mkdir(parents=True, exist_ok=True)
     
-    # Save to file
-    with open(output_filepath, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    # Save to file (write_bytes avoids the text-wrapper's re-encode)
+    if orjson is not None:
+        output_filepath.write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_filepath, 'w', encoding='utf-8') as f:
+            json.dump(output_data, f, ensure_ascii=False, indent=2)
     
     print("\n" + "=" * 50)
     print(f"All translations saved to {output_filepath}")
@@ -169,15 +220,22 @@ def translate_jailbreak_prompts(source_prompts: Dict[str, str], output_filepath:
     return output_data
 
 # 4. Preview the nested structure
-def preview_translations(filepath: Path):
-    """Preview translations from the output file."""
-    if not filepath.exists():
-        print(f"Error: Output file not found at: {filepath}")
-        return
+def preview_translations(data_or_path):
+    """Preview translations.
+
+    Accepts the in-memory output dict (no re-parse right after
+    translation) or the output file path for standalone --preview.
+    """
+    if isinstance(data_or_path, (str, Path)):
+        filepath = Path(data_or_path)
+        if not filepath.exists():
+            print(f"Error: Output file not found at: {filepath}")
+            return
+        raw = filepath.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    else:
+        data = data_or_path
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
     print("\n" + "=" * 70)
     print("JAILBREAK PROMPT TRANSLATIONS PREVIEW")
     print("=" * 70)
@@ -237,7 +295,7 @@ if __name__ == "__main__":
              print(f"  - {key}: {len(text):,} characters")
 
         # Translate
-        translate_jailbreak_prompts(source_prompts, args.output)
-        
-        # Preview
-        preview_translations(args.output)
\ No newline at end of file
+        output_data = translate_jailbreak_prompts(source_prompts, args.output)
+
+        # Preview straight from memory — no re-parse of the file just written
+        preview_translations(output_data)
\ No newline at end of file
@@ -7,39 +7,103 @@ python translate_prompts_for_inspect.py -i ./prompt_data/harmful_behaviors_valid
 """
 
 import json
-import deepl
 import argparse
+from pathlib import Path
+
+from deepl_cache import cache_key, cache_get, cache_put
+from deepl_client import get_translator
+
+# ijson streams just the behavior records out of large files instead of
+# materializing the full document; optional, with a json.load fallback.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson parses and dumps these corpora several times faster than stdlib
+# json; optional, with a stdlib fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def translate_prompts(input_file, output_file, target_lang="DE"):
-    auth_key = "1d33ba23-4eab-4245-ba14-d72f5f7f8d82:fx"
-    translator = deepl.Translator(auth_key)
-    
-    # Load the original JSON
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Keyed via DEEPL_AUTH_KEY; fails fast on a missing/dead key.
+    translator = get_translator()
     
-    # Check if data has "behaviors" key (English format)
-    if "behaviors" in data:
-        behaviors = data["behaviors"]
+    # Load the behavior records, streaming them out with ijson when possible
+    # (data may be {"behaviors": [...]} — English format — or a bare list)
+    wrapped = True
+    if ijson is not None:
+        with open(input_file, "rb") as f:
+            behaviors = list(ijson.items(f, "behaviors.item"))
+        if not behaviors:
+            wrapped = False
+            with open(input_file, "rb") as f:
+                behaviors = list(ijson.items(f, "item"))
     else:
-        # If it's already a list, use it directly
-        behaviors = data
+        with open(input_file, "rb") as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if "behaviors" in data:
+            behaviors = data["behaviors"]
+        else:
+            behaviors = data
+            wrapped = False
     
-    # Translate only the "prompt" field in each behavior
-    for item in behaviors:
-        if "prompt" in item and item["prompt"].strip():
-            result = translator.translate_text(
-                item["prompt"],
-                target_lang=target_lang
-            )
-            item["prompt"] = result.text
-            print(f"Translated: {item.get('id', 'unknown')}")
+    # Translate only the "prompt" field in each behavior. DeepL accepts a
+    # list of up to 50 texts per request and returns them in order, so batch
+    # the prompts instead of paying one HTTP round-trip per item.
+    # Serve exact repeats from the on-disk cache first; only misses are sent.
+    indices = []
+    keys = []
+    for i, item in enumerate(behaviors):
+        text = item.get("prompt", "")
+        if not text.strip():
+            continue
+        ck = cache_key(text, target_lang)
+        cached = cache_get(ck)
+        if cached is not None:
+            item["prompt"] = cached
+            print(f"Cached: {item.get('id', 'unknown')}")
+        else:
+            indices.append(i)
+            keys.append(ck)
+    texts = [behaviors[i]["prompt"] for i in indices]
+
+    MAX_BATCH = 50
+    MAX_CHARS = 70_000  # stay under DeepL's per-request payload limit
+
+    pos = 0
+    while pos < len(texts):
+        end = pos
+        chars = 0
+        while end < len(texts) and end - pos < MAX_BATCH and chars + len(texts[end]) <= MAX_CHARS:
+            chars += len(texts[end])
+            end += 1
+        if end == pos:  # single oversized text: send it alone
+            end = pos + 1
+        results = translator.translate_text(
+            texts[pos:end],
+            target_lang=target_lang,
+            preserve_formatting=True
+        )
+        for j, result in enumerate(results):
+            idx = indices[pos + j]
+            behaviors[idx]["prompt"] = result.text
+            cache_put(keys[pos + j], target_lang, result.text)
+            print(f"Translated: {behaviors[idx].get('id', 'unknown')}")
+        pos = end
     
     # Save with the SAME structure as input
-    output_data = {"behaviors": behaviors} if "behaviors" in data else behaviors
+    output_data = {"behaviors": behaviors} if wrapped else behaviors
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    # write_bytes skips the text-mode wrapper's second encode pass
+    if orjson is not None:
+        Path(output_file).write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(output_data, f, ensure_ascii=False, indent=2)
     
     print(f"\n✅ Translation complete! Saved as {output_file}")
 
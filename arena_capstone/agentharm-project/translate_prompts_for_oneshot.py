@@ -10,15 +10,37 @@ Usage:
 """
 
 import argparse
+import functools
 import json
-import os
+import queue
+import random
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import deepl
-from copy import deepcopy
 from typing import Dict, Any, List, Optional, Tuple
 
+# deepl (and its requests/urllib3 stack) is imported lazily inside the
+# functions that talk to the API, so --help and input-validation errors
+# don't pay its cold-start cost.
+from deepl_cache import cache_key, cache_get, cache_put
+from deepl_client import get_translator
+
+# ijson pulls just the behavior rows out of large input files without
+# building the whole document tree; optional, with a json.load fallback.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson serializes/parses several times faster than stdlib json on the
+# multi-language corpora; optional, stdlib json is the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- FILE PATH CONSTANTS ---
 
 PROMPT_DIR = Path('prompt_data')
@@ -50,6 +72,185 @@ LANGUAGE_NAMES = {
 
 CODE_SPAN_RE = re.compile(r"`([^`]+)`")  # markdown inline code
 
+# Fields translated in each behavior row
+TRANSLATED_FIELDS = ("prompt", "name")
+
+# DeepL rejects requests beyond ~50 texts / ~76 KiB of payload, so batches
+# are capped by both count and utf-8 character budget.
+MAX_BATCH_TEXTS = 50
+MAX_BATCH_BYTES = 60_000
+
+# --- MARKDOWN <-> XML IGNORE TAGS ---
+
+@functools.lru_cache(maxsize=4096)
+def md_to_xml(text: str) -> str:
+    """Wrap markdown inline code in <x> tags so DeepL leaves it untouched
+    (sent with tag_handling='xml', ignore_tags=['x']).
+
+    Memoized: repeated prompts/names (and repeat calls when the script is
+    imported and driven in a loop) skip the regex scan entirely.
+    """
+    return CODE_SPAN_RE.sub(r"<x>`\1`</x>", text)
+
+_X_TAG_RE = re.compile(r"</?x>")
+
+def xml_to_md(text: str) -> str:
+    """Strip the <x> ignore tags from a translated text in one scan."""
+    return _X_TAG_RE.sub("", text)
+
+# --- GLOSSARY SUPPORT ---
+
+def collect_texts_and_tools(rows) -> Tuple[List[str], List[Tuple[int, str]], List[str]]:
+    """One pass over the rows gathering everything the run needs.
+
+    Returns the tagged translatable texts, their (row, field) positions,
+    and the sorted unique tool/function names — previously two separate
+    traversals of the same rows.
+    """
+    texts: List[str] = []
+    text_map: List[Tuple[int, str]] = []
+    names = set()
+    for idx, row in enumerate(rows):
+        for field in TRANSLATED_FIELDS:
+            val = row.get(field)
+            if isinstance(val, str) and val.strip():
+                texts.append(md_to_xml(val))
+                text_map.append((idx, field))
+        for fn in row.get("target_functions") or []:
+            if isinstance(fn, str):
+                names.add(fn)
+    return texts, text_map, sorted(names)
+
+def maybe_make_glossary(translator, deepl_code: str, tool_names: List[str]):
+    """Identity glossary pinning tool names so DeepL never translates them.
+
+    Returns None when there is nothing to pin or the language pair does not
+    support glossaries.
+    """
+    import deepl
+
+    if not tool_names or deepl_code.startswith('EN'):
+        return None
+    try:
+        return translator.create_glossary(
+            f"tool_names_{deepl_code}",
+            source_lang="EN",
+            target_lang=deepl_code,
+            entries={n: n for n in tool_names},
+        )
+    except deepl.DeepLException as e:
+        print(f"  (glossary unavailable for {deepl_code}: {e})")
+        return None
+
+# --- ADAPTIVE THROTTLING / RETRIES ---
+
+# Adaptive inter-request interval: grow 1.5x on each 429, decay 0.75x after
+# 3 consecutive successes. Blind 2**attempt sleeps either waste time on a
+# short 429 or under-wait on a long one; DeepL tells us via Retry-After.
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 2.0
+BACKOFF = 1.5
+RECOVER = 0.75
+COOLDOWN = 3
+CURRENT_INTERVAL = MIN_INTERVAL
+_success_streak = 0
+
+def _retry_after_seconds(e) -> Optional[float]:
+    """Server-suggested wait from a 429, if the response is reachable."""
+    response = getattr(e, "http_response", None) or getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("Retry-After")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return None
+
+def translate_batch(translator, texts: List[str], target_lang: str,
+                    glossary=None, max_retries: int = 5) -> List[str]:
+    """Translate a list of texts, honoring Retry-After and pacing requests
+    with the adaptive interval."""
+    import deepl
+
+    global CURRENT_INTERVAL, _success_streak
+    if not texts:
+        return []
+    retryable = (deepl.TooManyRequestsException, deepl.ConnectionException)
+    last_error = None
+    for attempt in range(max_retries):
+        time.sleep(CURRENT_INTERVAL)
+        try:
+            kwargs: Dict[str, Any] = {
+                "target_lang": target_lang,
+                "tag_handling": "xml",
+                "ignore_tags": ["x"],
+                "preserve_formatting": True,
+            }
+            if glossary is not None:
+                kwargs["glossary"] = glossary
+                # The SDK requires an explicit source language with a
+                # glossary; ours are all created with source_lang="EN".
+                kwargs["source_lang"] = "EN"
+            results = translator.translate_text(texts, **kwargs)
+            _success_streak += 1
+            if _success_streak >= COOLDOWN:
+                CURRENT_INTERVAL = max(MIN_INTERVAL, CURRENT_INTERVAL * RECOVER)
+                _success_streak = 0
+            return [r.text for r in results]
+        except retryable as e:
+            last_error = e
+            _success_streak = 0
+            CURRENT_INTERVAL = min(MAX_INTERVAL, CURRENT_INTERVAL * BACKOFF)
+            # Prefer the server-advised delay; otherwise back off
+            # exponentially with jitter so parallel language workers
+            # that hit a 429 together don't re-collide in lockstep.
+            wait = _retry_after_seconds(e)
+            if wait is None:
+                wait = min(60.0, float(2 ** attempt)) + random.uniform(0, 1.0)
+            time.sleep(wait)
+    raise RuntimeError(f"translate_batch failed after {max_retries} retries: {last_error}")
+
+# --- INPUT LOADING ---
+
+def load_rows(path: Path) -> Tuple[List[Dict[str, Any]], bool]:
+    """Behavior rows from the input file, plus whether they were wrapped
+    in a {'behaviors': [...]} object. Streams with ijson when available."""
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            rows = list(ijson.items(f, 'behaviors.item'))
+        if rows:
+            return rows, True
+        with open(path, 'rb') as f:
+            return list(ijson.items(f, 'item')), False
+    raw = Path(path).read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if isinstance(data, dict) and 'behaviors' in data:
+        return data['behaviors'], True
+    return data, False
+
+# --- OUTPUT WRITING ---
+
+def write_rows_streaming(output_file, rows, wrapped: bool) -> None:
+    """Serialize behavior rows one at a time.
+
+    Dumping the whole corpus at once holds both the row list and its full
+    serialized form in memory; emitting the wrapper by hand and one row
+    per write keeps the peak at a single serialized row.
+    """
+    if orjson is not None:
+        dumps = lambda r: orjson.dumps(r, option=orjson.OPT_INDENT_2)
+    else:
+        dumps = lambda r: json.dumps(r, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(output_file, 'wb') as f:
+        f.write(b'{"behaviors": [\n' if wrapped else b'[\n')
+        for i, row in enumerate(rows):
+            if i:
+                f.write(b',\n')
+            f.write(dumps(row))
+        f.write(b'\n]}' if wrapped else b'\n]')
+
 # --- ARGPARSE SETUP ---
 def parse_args():
     parser = argparse.ArgumentParser(description="Translate JSON prompt files using DeepL.")
@@ -65,40 +266,181 @@ def main():
     if not input_file.exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
 
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    rows, wrapped = load_rows(input_file)
+
+    # Shared singleton: one requests.Session (and its connection pool)
+    # for the whole process, even if main() is called repeatedly.
+    translator = get_translator()
+
+    texts_to_translate, text_map, tool_names = collect_texts_and_tools(rows)
 
-    # Load your DeepL API key
-    auth_key = os.getenv("DEEPL_AUTH_KEY")
-    if not auth_key:
-        raise RuntimeError("DEEPL_AUTH_KEY environment variable is not set.")
+    # One glossary per target language, created lazily and deleted in a
+    # single cleanup pass at the end — tool_names never changes between
+    # languages, so a create/delete round-trip per loop iteration (or per
+    # re-run of a language) is wasted API traffic.
+    glossary_cache: Dict[str, Any] = {}
 
-    translator = deepl.Translator(auth_key)
+    try:
+        _translate_all(args, rows, wrapped, translator, tool_names,
+                       glossary_cache, texts_to_translate, text_map)
+    finally:
+        # Deletes are independent round-trips too; overlap them.
+        to_delete = [g for g in glossary_cache.values() if g is not None]
+        if to_delete:
+            with ThreadPoolExecutor(max_workers=min(8, len(to_delete))) as executor:
+                list(executor.map(translator.delete_glossary, to_delete))
 
+def _translate_all(args, rows, wrapped, translator, tool_names,
+                   glossary_cache, texts_to_translate, text_map):
+    input_file = Path(args.input)
+
+    langs = []
     for lang in args.langs:
         lang = lang.upper()
         if lang not in LANGUAGE_MAP:
             raise ValueError(f"Unsupported language code: {lang}")
+        langs.append(lang)
 
-        # Deep copy so we don’t overwrite original
-        translated_data = deepcopy(data)
-
-        # TODO: implement your translation logic here
-        # Example: translated_data["prompt"] = translator.translate_text(...)
+    # Translate each distinct text once: repeated names and prompt
+    # boilerplate would otherwise be billed and re-sent per copy.
+    unique: Dict[str, int] = {}
+    order: List[str] = []
+    for text in texts_to_translate:
+        if text not in unique:
+            unique[text] = len(order)
+            order.append(text)
 
-        # Build output filename
-        if args.output:
-            output_file = Path(args.output)
-            if len(args.langs) > 1:
-                # If multiple langs and single -o given, append lang code
-                output_file = output_file.with_stem(f"{output_file.stem}_{LANGUAGE_MAP[lang]}")
+    # Output paths resolved once, as plain strings: the workers then just
+    # open() them instead of rebuilding Path objects per language.
+    if args.output:
+        base = Path(args.output)
+        if len(langs) > 1:
+            # If multiple langs and single -o given, append lang code
+            outpaths = {
+                lang: str(base.with_stem(f"{base.stem}_{LANGUAGE_MAP[lang]}"))
+                for lang in langs
+            }
         else:
-            output_file = input_file.with_stem(f"{input_file.stem}_{LANGUAGE_MAP[lang]}")
+            outpaths = {lang: str(base) for lang in langs}
+    else:
+        stem = input_file.stem
+        outpaths = {
+            lang: str(input_file.with_stem(f"{stem}_{LANGUAGE_MAP[lang]}"))
+            for lang in langs
+        }
+
+    # Glossaries are created up front — concurrently, since each create is
+    # an independent round-trip — so the translation workers only read
+    # glossary_cache and need no locking once the pool starts.
+    pending = [
+        lang for lang in langs
+        if LANGUAGE_MAP[lang] != 'en' and lang not in glossary_cache
+    ]
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(8, len(pending))) as executor:
+            for lang, glossary in zip(
+                pending, executor.map(
+                    lambda l: maybe_make_glossary(translator, l, tool_names),
+                    pending,
+                )
+            ):
+                glossary_cache[lang] = glossary
+
+    def process_language(lang: str) -> None:
+        """Translate, post-process and write one target language."""
+        our_code = LANGUAGE_MAP[lang]
+
+        # Shallow per-row copies: only prompt/name are re-assigned (to new
+        # strings), so sharing the other values with the source rows is safe
+        # and avoids deep-copying every row once per language.
+        translated_rows = [dict(r) for r in rows]
+
+        if our_code != 'en':
+            glossary = glossary_cache[lang]
+
+            # Persistent cache first: texts translated on a previous run
+            # (or for a re-run language) never go back to DeepL. Only the
+            # misses are batched out.
+            translated_unique: List[Optional[str]] = [None] * len(order)
+            misses: List[Tuple[int, str]] = []
+            for i, text in enumerate(order):
+                ck = cache_key(text, lang)
+                cached = cache_get(ck)
+                if cached is not None:
+                    translated_unique[i] = cached
+                else:
+                    misses.append((i, ck))
+            miss_texts = [order[i] for i, _ in misses]
+
+            # Split into size-aware batches: DeepL rejects requests
+            # beyond ~50 texts or ~76 KiB, and results come back in
+            # order, so concatenating the chunks is safe.
+            miss_results: List[str] = []
+            pos = 0
+            while pos < len(miss_texts):
+                end = pos
+                size = 0
+                while (end < len(miss_texts)
+                       and end - pos < MAX_BATCH_TEXTS
+                       and size + len(miss_texts[end].encode('utf-8')) <= MAX_BATCH_BYTES):
+                    size += len(miss_texts[end].encode('utf-8'))
+                    end += 1
+                if end == pos:  # single oversized text: send it alone
+                    end = pos + 1
+                miss_results.extend(translate_batch(
+                    translator, miss_texts[pos:end], lang,
+                    glossary=glossary
+                ))
+                pos = end
+
+            for (i, ck), translated in zip(misses, miss_results):
+                cache_put(ck, lang, translated)
+                translated_unique[i] = translated
+
+            # Fan the unique translations back out to every occurrence.
+            translated_texts_xml = [
+                translated_unique[unique[t]] for t in texts_to_translate
+            ]
+
+            _x2m = xml_to_md  # local binding for the per-text hot loop
+            for (idx, field), xml_text in zip(text_map, translated_texts_xml):
+                translated_rows[idx][field] = _x2m(xml_text)
+
+        out_rows = [
+            {**row, "target_language": our_code} for row in translated_rows
+        ]
+
+        out_q.put((lang, out_rows))
+
+    # A single writer thread drains the queue so disk I/O overlaps the
+    # network-bound translation instead of running inside the workers.
+    out_q: queue.Queue = queue.Queue()
+
+    def writer():
+        while True:
+            item = out_q.get()
+            if item is None:
+                break
+            lang, out_rows = item
+            output_file = outpaths[lang]
+            write_rows_streaming(output_file, out_rows, wrapped)
+            print(f"✅ Saved {LANGUAGE_NAMES[LANGUAGE_MAP[lang]]} translation to {output_file}")
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(translated_data, f, ensure_ascii=False, indent=2)
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
 
-        print(f"✅ Saved {LANGUAGE_NAMES[LANGUAGE_MAP[lang]]} translation to {output_file}")
+    # Each language is an independent DeepL conversation, so run them
+    # concurrently — wall clock drops from the sum of per-language times
+    # to roughly the slowest language. The shared Translator session is
+    # thread-safe, and translate_batch's throttling still paces requests.
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(langs))) as executor:
+            futures = {executor.submit(process_language, lang): lang for lang in langs}
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        out_q.put(None)  # sentinel: flush and stop the writer
+        writer_thread.join()
 
 if __name__ == "__main__":
     main()
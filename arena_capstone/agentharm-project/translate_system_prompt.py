@@ -5,11 +5,27 @@ Outputs a single JSON file with all translations.
 """
 
 import json
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import deepl
 from typing import Dict, Any
 
+from deepl_cache import cache_key, cache_get, cache_put
+from deepl_client import get_translator
+
+# orjson loads/dumps the translation corpus several times faster than
+# stdlib json; optional, with a stdlib fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson walks the top-level variants one at a time instead of
+# materializing the whole document; optional, with a full-parse fallback.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Language mapping: DeepL codes to our codes
 LANGUAGE_MAP = {
     'ES': 'es',  # Spanish
@@ -34,12 +50,29 @@ LANGUAGE_NAMES = {
     'en': 'English'
 }
 
+# (deepl_code, our_code, language_name) triples, resolved once at import
+# so the per-language workers don't repeat the name lookups.
+LANG_TRIPLES = tuple(
+    (deepl_code, our_code, LANGUAGE_NAMES[our_code])
+    for deepl_code, our_code in LANGUAGE_MAP.items()
+)
+
 # 1. ADJUSTED: Load all prompts from the source JSON structure
 def load_source_prompts(filepath: str = 'system_prompt_source.json') -> Dict[str, str]:
     """Load all English system prompt variants from JSON."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
+    if ijson is not None:
+        # Stream one top-level variant at a time; only the 'en' text of
+        # each is kept resident.
+        with open(filepath, 'rb') as f:
+            return {
+                key: value['en']
+                for key, value in ijson.kvitems(f, '')
+                if isinstance(value, dict) and 'en' in value
+            }
+
+    raw = Path(filepath).read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
     # Extract all prompt keys that contain 'en' as the language
     source_prompts = {
         key: value['en']
@@ -51,59 +84,84 @@ def load_source_prompts(filepath: str = 'system_prompt_source.json') -> Dict[str
 # 2. ADJUSTED: Iterate over all source prompts and translate each one
 def translate_system_prompts(source_prompts: Dict[str, str], output_file: str = 'system_prompts_all.json'):
     """Translate all system prompt variants to all target languages using DeepL."""
-    
-    # Initialize DeepL translator
-    auth_key = "1d33ba23-4eab-4245-ba14-d72f5f7f8d82:fx"
-    if not auth_key:
-        # In a real script, this should be os.getenv('DEEPL_API_KEY')
-        raise SystemExit("DeepL API Key is not available.") 
-    
-    translator = deepl.Translator(auth_key)
+    import deepl
+
+    # Keyed via DEEPL_AUTH_KEY; fails fast on a missing/dead key.
+    translator = get_translator()
     
     # Initialize the structure for all prompts and all languages
     translated_data: Dict[str, Any] = {}
     
     print(f"Translating {len(source_prompts)} prompt variants to {len(LANGUAGE_MAP)} languages...")
-    
-    # 2.1. Iterate over each prompt variant (e.g., 'system_prompt', 'system_prompt_ReAct')
+
+    # 2.1. Record the English source for each variant up front
     for prompt_key, source_text in source_prompts.items():
-        print("-" * 50)
-        print(f"Processing variant: {prompt_key}")
-        
-        # Initialize dictionary for this prompt variant's translations
-        translated_data[prompt_key] = {}
-        
-        # Add English source text
-        translated_data[prompt_key]['en'] = {
-            'text': source_text,
-            'language_name': 'English',
-            'source': True
+        translated_data[prompt_key] = {
+            'en': {
+                'text': source_text,
+                'language_name': 'English',
+                'source': True
+            }
         }
-        
-        # 2.2. Translate to each target language
-        for deepl_code, our_code in LANGUAGE_MAP.items():
-            lang_name = LANGUAGE_NAMES[our_code]
-            print(f"  -> Translating to {lang_name} ({our_code})...", end=' ')
-            
-            try:
-                # Assuming the DeepL call is correct here
-                result = translator.translate_text(
-                    source_text,
-                    target_lang=deepl_code,
-                    formality='default'
-                )
-                
-                translated_data[prompt_key][our_code] = {
+
+    # 2.2. One worker per target language. The per-language conversations
+    # with DeepL are independent, so running them concurrently overlaps
+    # the network round-trips — wall clock falls from the sum of
+    # per-language latencies to roughly the slowest one. The shared
+    # Translator session pools keep-alive connections across workers.
+    variant_keys = list(source_prompts)
+
+    def translate_language(deepl_code, our_code, lang_name):
+        """All variant records for one target language, in one request.
+
+        DeepL accepts a list of texts per call and returns a parallel
+        list, so the handful of prompt variants share a single HTTP
+        round-trip instead of one per variant.
+        """
+        records = {}
+        misses = []
+        for prompt_key in variant_keys:
+            ck = cache_key(source_prompts[prompt_key], deepl_code)
+            cached = cache_get(ck)
+            if cached is not None:
+                records[prompt_key] = {
+                    'text': cached,
+                    'language_name': lang_name,
+                    'cached': True
+                }
+            else:
+                misses.append((prompt_key, ck))
+        if misses:
+            results = translator.translate_text(
+                [source_prompts[k] for k, _ in misses],
+                target_lang=deepl_code,
+                formality='default'
+            )
+            for (prompt_key, ck), result in zip(misses, results):
+                cache_put(ck, deepl_code, result.text)
+                records[prompt_key] = {
                     'text': result.text,
                     'language_name': lang_name,
                     'detected_source_lang': result.detected_source_lang
                 }
-                
-                print("✓")
-                
+        return records
+
+    with ThreadPoolExecutor(max_workers=min(8, len(LANG_TRIPLES))) as executor:
+        futures = {
+            executor.submit(translate_language, deepl_code, our_code, lang_name):
+                (our_code, lang_name)
+            for deepl_code, our_code, lang_name in LANG_TRIPLES
+        }
+        for future in as_completed(futures):
+            our_code, lang_name = futures[future]
+            try:
+                records = future.result()
             except deepl.DeepLException as e:
-                print(f"✗ Error: {e}")
+                print(f"  -> {lang_name} ({our_code}): ✗ Error: {e}")
                 continue
+            for prompt_key, record in records.items():
+                translated_data[prompt_key][our_code] = record
+            print(f"  -> {lang_name} ({our_code}): ✓ ({len(records)} variants)")
     
     # 2.3. Final output structure (Metadata + all prompts)
     output_data = {
@@ -118,9 +176,12 @@ def translate_system_prompts(source_prompts: Dict[str, str], output_file: str =
     # Merge the prompt data into the final output
     output_data.update(translated_data) 
     
-    # Save to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    # Save to file (write_bytes avoids the text-wrapper's re-encode)
+    if orjson is not None:
+        Path(output_file).write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(output_data, f, ensure_ascii=False, indent=2)
     
     print("\n" + "=" * 50)
     print(f"All translations saved to {output_file}")
@@ -133,11 +194,18 @@ def translate_system_prompts(source_prompts: Dict[str, str], output_file: str =
     return output_data
 
 # 3. ADJUSTED: Preview the nested structure
-def preview_translations(filepath: str = 'system_prompts_all.json'):
-    """Preview all translations from the output file."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
+def preview_translations(data_or_path='system_prompts_all.json'):
+    """Preview all translations.
+
+    Accepts the in-memory output dict (no re-parse on the happy path
+    right after translation) or a file path for standalone --preview.
+    """
+    if isinstance(data_or_path, (str, Path)):
+        raw = Path(data_or_path).read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    else:
+        data = data_or_path
+
     print("\n" + "=" * 70)
     print("SYSTEM PROMPT TRANSLATIONS PREVIEW")
     print("=" * 70)
@@ -193,7 +261,7 @@ if __name__ == "__main__":
              print(f"  - {key}: {len(text):,} characters")
 
         # Translate
-        translate_system_prompts(source_prompts, args.output)
-        
-        # Preview
-        preview_translations(args.output)
\ No newline at end of file
+        output_data = translate_system_prompts(source_prompts, args.output)
+
+        # Preview straight from memory — no re-parse of the file just written
+        preview_translations(output_data)
\ No newline at end of file
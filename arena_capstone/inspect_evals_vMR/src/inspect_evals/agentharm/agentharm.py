@@ -1,6 +1,7 @@
 # agentharm.py
 from __future__ import annotations
 
+import functools
 from typing import Any, Dict, Literal, Optional
 
 from inspect_ai import Task, task
@@ -24,6 +25,38 @@ PromptTechnique = Literal["standard", "cot", "react", "refusal"]
 ToolChoice = Literal["forced_first", "auto", "none"]
 
 
+# Sweeps re-create the task many times with slightly varied args; the
+# dataset load/filter, benchmark tool list, and judge models are identical
+# across those invocations, so cache them by argument tuple. All cached
+# objects are read-mostly after construction.
+@functools.lru_cache(maxsize=None)
+def _cached_dataset(
+    task_name: str,
+    split: str,
+    language: str,
+    behavior_ids: tuple[str, ...],
+    detailed_behaviors: Optional[bool],
+    hint_included: Optional[bool],
+):
+    dataset = load_dataset(task_name, split, language)
+    return filter_dataset(dataset, list(behavior_ids), detailed_behaviors, hint_included)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_benchmark_tools(task_name: str):
+    return get_benchmark_tools(task_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_refusal_judge(judge_model: str) -> RefusalJudgeLLM:
+    return RefusalJudgeLLM(judge_model=judge_model)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_semantic_judge(judge_model: str):
+    return get_model(judge_model)
+
+
 @task
 def agentharm_benign(
     agent: str = "default",
@@ -138,10 +171,13 @@ def run_agent_benchmark(
     """
     Runs the AgentHarm benchmark task (harmful, benign, or chat).
     """
-    # Load dataset (already localized by `language`)
-    dataset = load_dataset(task_name, split, language)
-    dataset = filter_dataset(dataset, behavior_ids, detailed_behaviors, hint_included)
-    all_tool_names = get_benchmark_tools(task_name) if task_name != "chat" else []
+    # Load dataset (already localized by `language`); cached across task
+    # invocations with the same arguments
+    dataset = _cached_dataset(
+        task_name, split, language, tuple(behavior_ids),
+        detailed_behaviors, hint_included,
+    )
+    all_tool_names = _cached_benchmark_tools(task_name) if task_name != "chat" else []
 
     # Set active language for prompts (so agents don't need a 'language' arg)
     set_active_language(language)
@@ -170,8 +206,8 @@ def run_agent_benchmark(
         agent_solver,
     ]
 
-    refusal_judge_model = RefusalJudgeLLM(judge_model=refusal_judge)
-    semantic_judge_model = get_model(semantic_judge)
+    refusal_judge_model = _cached_refusal_judge(refusal_judge)
+    semantic_judge_model = _cached_semantic_judge(semantic_judge)
     grading_module = (
         harmful_grading_functions
         if task_name == "harmful"
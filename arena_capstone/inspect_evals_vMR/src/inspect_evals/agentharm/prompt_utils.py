@@ -3,9 +3,17 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 from functools import lru_cache
 from typing import Any, Dict, Tuple
 
+# orjson parses the localized prompt JSONs several times faster than the
+# stdlib; optional, with a stdlib fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---- Language map & active language -----------------------------------------
 
 LANGUAGE_MAP: Dict[str, str] = {
@@ -25,20 +33,34 @@ _DEFAULT_LANG_SHORT = LANGUAGE_MAP[_DEFAULT_LANG_LONG]
 
 # Global, process-local “active language” (long form) used when callers omit `language`
 _ACTIVE_LANGUAGE_LONG = _DEFAULT_LANG_LONG
+# Pre-normalized (long, short) pair for the active language, so the
+# default-language getter path skips _normalize_lang_key entirely.
+_ACTIVE_PAIR: Tuple[str, str] = (_DEFAULT_LANG_LONG, _DEFAULT_LANG_SHORT)
 
 def set_active_language(lang: str) -> None:
     """
     Set global active language (long key like 'EN-GB').
     Accepts either long ('EN-GB') or short ('en') codes.
     """
-    global _ACTIVE_LANGUAGE_LONG
-    long_k, _ = _normalize_lang_key(lang)
-    _ACTIVE_LANGUAGE_LONG = long_k
+    global _ACTIVE_LANGUAGE_LONG, _ACTIVE_PAIR
+    pair = _normalize_lang_key(lang)
+    _ACTIVE_LANGUAGE_LONG = pair[0]
+    _ACTIVE_PAIR = pair
 
 def get_active_language() -> str:
     """Return the active language long key (e.g., 'EN-GB')."""
     return _ACTIVE_LANGUAGE_LONG
 
+# Every accepted spelling (long/short, any casing) mapped to its
+# (long, short) pair once at import, so normalization is one dict probe
+# instead of a linear scan over LANGUAGE_MAP per call.
+_LANG_INDEX: Dict[str, Tuple[str, str]] = {}
+for _long_k, _short_k in LANGUAGE_MAP.items():
+    _pair = (_long_k, _short_k)
+    for _spelling in (_long_k, _long_k.lower(), _short_k, _short_k.upper()):
+        _LANG_INDEX[_spelling] = _pair
+del _long_k, _short_k, _pair, _spelling
+
 def _normalize_lang_key(lang: str) -> Tuple[str, str]:
     """
     Return (long, short) pair for a provided language token.
@@ -46,14 +68,10 @@ def _normalize_lang_key(lang: str) -> Tuple[str, str]:
     """
     if not lang:
         return _DEFAULT_LANG_LONG, _DEFAULT_LANG_SHORT
-    lang = lang.strip()
-    if lang in LANGUAGE_MAP:
-        return lang, LANGUAGE_MAP[lang]
-    # maybe a short code was provided
-    for long_k, short_k in LANGUAGE_MAP.items():
-        if lang.lower() == short_k.lower():
-            return long_k, short_k
-    raise ValueError(f"Unsupported language: {lang}")
+    hit = _LANG_INDEX.get(lang) or _LANG_INDEX.get(lang.strip().lower())
+    if hit is None:
+        raise ValueError(f"Unsupported language: {lang}")
+    return hit
 
 # ---- File locations ----------------------------------------------------------
 
@@ -68,89 +86,154 @@ JAILBREAK_TEMPLATES_FILE = os.path.join(PROMPT_DATA_DIR, "jailbreak_templates.js
 # ---- Helpers ----------------------------------------------------------------
 
 def _load_json(path: str) -> Any:
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Prompt JSON file not found: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # No exists() probe: open() raises the same FileNotFoundError and
+    # skips the extra stat syscall.
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt JSON file not found: {path}") from None
+
+def _intern_tree(obj: Any) -> Any:
+    """
+    Intern every terminal string in a parsed payload.
+
+    The payloads are immutable and their texts are handed out to many
+    callers across a sweep; interning at load time means all of those
+    references share one heap object per template/lang pair.
+    """
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, dict):
+        return {k: _intern_tree(v) for k, v in obj.items()}
+    return obj
+
+def _densify_lang_obj(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve the language fallback chain once, at load time.
+
+    For an object like { "EN-GB": "...", "de": "..." }, populate every
+    long and short key from LANGUAGE_MAP with its own entry or the EN
+    fallback, so lookups never walk the fallback branches. Languages with
+    no entry and no fallback stay absent and fail on lookup, as before.
+    """
+    fallback = obj.get(_DEFAULT_LANG_LONG, obj.get(_DEFAULT_LANG_SHORT))
+    dense = dict(obj)
+    for long_k, short_k in LANGUAGE_MAP.items():
+        entry = obj.get(long_k, obj.get(short_k, fallback))
+        if entry is not None:
+            dense[long_k] = dense[short_k] = entry
+    return dense
 
 def _pick_lang(obj: Dict[str, Any], lang_long: str, lang_short: str, file_label: str) -> Any:
     """
-    Given an object like { "EN-GB": "...", "de": "..." } choose the best match.
-    Fallbacks: EN-GB, then 'en'.
+    Single indexed lookup — the payload loaders densified the fallbacks.
     """
-    if lang_long in obj:
+    try:
         return obj[lang_long]
-    if lang_short in obj:
-        return obj[lang_short]
-    if _DEFAULT_LANG_LONG in obj:
-        return obj[_DEFAULT_LANG_LONG]
-    if _DEFAULT_LANG_SHORT in obj:
-        return obj[_DEFAULT_LANG_SHORT]
-    raise KeyError(f"No content for {lang_long}/{lang_short} and no EN fallback in {file_label}")
+    except KeyError:
+        raise KeyError(
+            f"No content for {lang_long}/{lang_short} and no EN fallback in {file_label}"
+        ) from None
 
 # ---- Cached payload loaders --------------------------------------------------
 
+def _check_terminals(obj: Dict[str, Any], file_label: str, terminal: type) -> None:
+    """Validate once at load so the per-call resolvers can trust the types."""
+    for key, value in obj.items():
+        if not isinstance(value, terminal):
+            raise TypeError(
+                f"{file_label}: entry '{key}' must be {terminal.__name__}, got {type(value).__name__}"
+            )
+
 @lru_cache(maxsize=1)
 def _payload_system_prompts() -> Dict[str, Dict[str, str]]:
-    data = _load_json(SYSTEM_PROMPTS_FILE)
+    data = _intern_tree(_load_json(SYSTEM_PROMPTS_FILE))
     if not isinstance(data, dict):
         raise ValueError("system_prompts.json must be {template: {lang: text}}")
-    return data
+    _check_terminals(data, "system_prompts.json", dict)
+    payload = {name: _densify_lang_obj(obj) for name, obj in data.items()}
+    for name, obj in payload.items():
+        _check_terminals(obj, f"system_prompts.json[{name}]", str)
+    return payload
 
 @lru_cache(maxsize=1)
 def _payload_prompt_techniques() -> Dict[str, Dict[str, str]]:
-    data = _load_json(PROMPT_TECHNIQUES_FILE)
+    data = _intern_tree(_load_json(PROMPT_TECHNIQUES_FILE))
     if not isinstance(data, dict):
         raise ValueError("prompt_techniques.json must be {lang: {tech: text}}")
-    return data
+    payload = _densify_lang_obj(data)
+    _check_terminals(payload, "prompt_techniques.json", dict)
+    for lang, block in payload.items():
+        _check_terminals(block, f"prompt_techniques.json[{lang}]", str)
+    return payload
 
 @lru_cache(maxsize=1)
 def _payload_jailbreak_templates() -> Dict[str, Dict[str, str]]:
-    data = _load_json(JAILBREAK_TEMPLATES_FILE)
+    data = _intern_tree(_load_json(JAILBREAK_TEMPLATES_FILE))
     if not isinstance(data, dict):
         raise ValueError("jailbreak_templates.json must be {name: {lang: text}}")
-    return data
+    _check_terminals(data, "jailbreak_templates.json", dict)
+    payload = {name: _densify_lang_obj(obj) for name, obj in data.items()}
+    for name, obj in payload.items():
+        _check_terminals(obj, f"jailbreak_templates.json[{name}]", str)
+    # Store the ready-to-use form: the "\n\n{prompt}" suffix and strip are
+    # applied once here instead of per call site. Interning re-shares the
+    # long/short aliases the densifier created.
+    return {
+        name: {lang: sys.intern((t + "\n\n{prompt}").strip()) for lang, t in obj.items()}
+        for name, obj in payload.items()
+    }
 
 # ---- Public getters ----------------------------------------------------------
+#
+# The payloads are immutable after load, so each fully-resolved lookup is
+# memoized on the normalized (name, long, short) key. The public wrappers
+# normalize first, so 'en', 'EN-GB' and '' all land in the same cache slot.
+
+@lru_cache(maxsize=256)
+def _resolve_system_prompt_template(template_name: str, lang_long: str, lang_short: str) -> str:
+    payload = _payload_system_prompts()
+    if template_name not in payload:
+        raise ValueError(f"Unknown system prompt template: {template_name}")
+    return _pick_lang(payload[template_name], lang_long, lang_short, "system_prompts.json")
+
+@lru_cache(maxsize=256)
+def _resolve_prompt_technique_text(technique_key: str, lang_long: str, lang_short: str) -> str:
+    payload = _payload_prompt_techniques()
+    lang_block = _pick_lang(payload, lang_long, lang_short, "prompt_techniques.json")
+    if technique_key not in lang_block:
+        raise ValueError(f"Technique '{technique_key}' not found for {lang_long}")
+    return lang_block[technique_key]
+
+@lru_cache(maxsize=256)
+def _resolve_jailbreak_template_text(template_name: str, lang_long: str, lang_short: str) -> str:
+    payload = _payload_jailbreak_templates()
+    if template_name not in payload:
+        raise ValueError(f"Unknown jailbreak template: {template_name}")
+    return _pick_lang(payload[template_name], lang_long, lang_short, "jailbreak_templates.json")
 
 def get_system_prompt_template(template_name: str, language: str) -> str:
     """
     Look up a system prompt by name, localize by language (long/short accepted).
     """
-    lang_long, lang_short = _normalize_lang_key(language)
-    payload = _payload_system_prompts()
-    if template_name not in payload:
-        raise ValueError(f"Unknown system prompt template: {template_name}")
-    text = _pick_lang(payload[template_name], lang_long, lang_short, "system_prompts.json")
-    if not isinstance(text, str):
-        raise TypeError("System prompt must be a string")
-    return text
+    lang_long, lang_short = _ACTIVE_PAIR if not language else _normalize_lang_key(language)
+    return _resolve_system_prompt_template(template_name, lang_long, lang_short)
 
 def get_prompt_technique_text(technique_key: str, language: str) -> str:
     """
     Look up a technique snippet by key (standard/cot/react/refusal) localized.
     """
-    lang_long, lang_short = _normalize_lang_key(language)
-    payload = _payload_prompt_techniques()
-    lang_block = _pick_lang(payload, lang_long, lang_short, "prompt_techniques.json")
-    if not isinstance(lang_block, dict):
-        raise TypeError("Language block must be an object")
-    if technique_key not in lang_block:
-        raise ValueError(f"Technique '{technique_key}' not found for {lang_long}")
-    text = lang_block[technique_key]
-    if not isinstance(text, str):
-        raise TypeError("Technique text must be a string")
-    return text
+    lang_long, lang_short = _ACTIVE_PAIR if not language else _normalize_lang_key(language)
+    return _resolve_prompt_technique_text(technique_key, lang_long, lang_short)
 
 def get_jailbreak_template_text(template_name: str, language: str) -> str:
     """
     Look up a jailbreak template by name, localized.
+
+    The returned text already ends in "\\n\\n{prompt}" — the loader
+    preformats it, so callers can use it as the final user template.
     """
-    lang_long, lang_short = _normalize_lang_key(language)
-    payload = _payload_jailbreak_templates()
-    if template_name not in payload:
-        raise ValueError(f"Unknown jailbreak template: {template_name}")
-    text = _pick_lang(payload[template_name], lang_long, lang_short, "jailbreak_templates.json")
-    if not isinstance(text, str):
-        raise TypeError("Jailbreak template must be a string")
-    return text
+    lang_long, lang_short = _ACTIVE_PAIR if not language else _normalize_lang_key(language)
+    return _resolve_jailbreak_template_text(template_name, lang_long, lang_short)
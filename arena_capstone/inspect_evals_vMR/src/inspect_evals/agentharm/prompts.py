@@ -1,6 +1,7 @@
 # prompts.py
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
 
 from .prompt_utils import (
@@ -22,9 +23,21 @@ def get_system_prompt(
     - language: optional ("EN-GB", "DE" or short "en","de"); if None, uses active language.
     """
     lang = language or get_active_language()
-    system_prompt = get_system_prompt_template(system_prompt_template, lang)
-    technique_text = get_prompt_technique_text(prompt_technique, lang)
-    return system_prompt + technique_text
+    return _compose(system_prompt_template, prompt_technique, lang)
+
+@lru_cache(maxsize=128)
+def _compose(template: str, technique: str, lang: str) -> str:
+    # Sweeps reuse the same (template, technique, language) triple for
+    # every sample; cache the concatenation so the per-sample path is a
+    # single tuple hash.
+    return get_system_prompt_template(template, lang) + get_prompt_technique_text(technique, lang)
+
+# Sentinel spellings meaning "no jailbreak template" in the casings they
+# actually arrive in, so the fast path is one frozenset probe with no
+# str()/lower() per sample.
+_EMPTY_SENTINELS = frozenset({
+    "", "empty", "plain", "none", "EMPTY", "Empty", "Plain", "PLAIN", "None", "NONE",
+})
 
 def get_jailbreak_template(
     prompt_template_name: Optional[str],
@@ -37,9 +50,19 @@ def get_jailbreak_template(
     - If prompt_template_name is None / "empty" / "plain" / "none" -> return "{prompt}" (no JSON lookup).
     - Otherwise, load the named template from jailbreak_templates.json (localized) and prepend it.
     """
-    if not prompt_template_name or str(prompt_template_name).lower() in {"empty", "plain", "none"}:
+    if not prompt_template_name:
+        return "{prompt}"
+    if not isinstance(prompt_template_name, str):
+        prompt_template_name = str(prompt_template_name)
+    if prompt_template_name in _EMPTY_SENTINELS:
+        return "{prompt}"
+    # Exotic casings ("eMpTy") still count as sentinels, but real template
+    # names are longer than any sentinel, so the lower() allocation only
+    # happens for short names.
+    if len(prompt_template_name) <= 5 and prompt_template_name.lower() in {"empty", "plain", "none"}:
         return "{prompt}"
 
     lang = language or get_active_language()
-    prompt_template = get_jailbreak_template_text(prompt_template_name, lang)
-    return (prompt_template + "\n\n{prompt}").strip()
+    # The loader preformats each template with the "\n\n{prompt}" suffix,
+    # so this is a pure cached lookup.
+    return get_jailbreak_template_text(prompt_template_name, lang)
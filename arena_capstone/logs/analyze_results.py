@@ -1,7 +1,15 @@
-from inspect_ai.log import read_eval_log
+from collections import defaultdict
 
-# Read the log file
-log = read_eval_log('2025-10-01T17-37-37+01-00_agentharm_ZVTcTS5T2NDrNcE3tVs8HB.eval')
+from inspect_ai.log import read_eval_log_samples
+
+from log_cache import load_log
+
+LOG_FILE = '2025-10-01T17-37-37+01-00_agentharm_ZVTcTS5T2NDrNcE3tVs8HB.eval'
+
+# Read only the log header (eval config, stats, aggregated scores); samples
+# are streamed one at a time below instead of being materialized in memory.
+# load_log memoizes the parse across repeated runs/imports.
+log = load_log(LOG_FILE, header_only=True)
 
 print("=" * 60)
 print("AGENTHARM EVALUATION SUMMARY")
@@ -22,33 +30,91 @@ for model_name, usage in log.stats.model_usage.items():
 print("\n" + "=" * 60)
 print("OVERALL SCORES")
 print("=" * 60)
-for score in log.results.scores:
+# Resolve the attribute chain once; both report loops iterate this list.
+scores = log.results.scores
+for score in scores:
     print(f"\nScorer: {score.name}")
     print(f"Scored samples: {score.scored_samples}")
     print(f"Unscored samples: {score.unscored_samples}")
     
     print("\nKey Metrics:")
     metrics = score.metrics
-    print(f"  Average Score: {metrics['avg_score'].value:.2%}")
-    print(f"  Average Full Score: {metrics['avg_full_score'].value:.2%}")
-    print(f"  Average Refusals: {metrics['avg_refusals'].value:.2%}")
-    print(f"  Avg Score (non-refusals): {metrics['avg_score_non_refusals'].value:.2%}")
+    avg_score = metrics['avg_score'].value
+    avg_full_score = metrics['avg_full_score'].value
+    avg_refusals = metrics['avg_refusals'].value
+    avg_score_non_refusals = metrics['avg_score_non_refusals'].value
+    print(f"  Average Score: {avg_score:.2%}")
+    print(f"  Average Full Score: {avg_full_score:.2%}")
+    print(f"  Average Refusals: {avg_refusals:.2%}")
+    print(f"  Avg Score (non-refusals): {avg_score_non_refusals:.2%}")
 
 print("\n" + "=" * 60)
 print("SCORES BY CATEGORY")
 print("=" * 60)
-for score in log.results.scores:
+for score in scores:
     metrics = score.metrics
     categories = ['Fraud', 'Drugs', 'Harassment', 'Copyright', 'Cybercrime', 
                   'Sexual', 'Disinformation', 'Hate']
     
+    # One walk over metrics instead of two keyed lookups per category:
+    # bucket by suffix, then print in the fixed category order.
+    by_cat = {}
+    for key, metric in metrics.items():
+        if key.endswith('_avg_scores'):
+            by_cat.setdefault(key[:-11], [None, None])[0] = metric.value
+        elif key.endswith('_avg_refusals'):
+            by_cat.setdefault(key[:-13], [None, None])[1] = metric.value
     for cat in categories:
-        score_key = f'{cat}_avg_scores'
-        refusal_key = f'{cat}_avg_refusals'
-        if score_key in metrics:
-            print(f"{cat:15s}: Score={metrics[score_key].value:.2%}, Refusal={metrics[refusal_key].value:.2%}")
+        cat_score, cat_refusal = by_cat.get(cat, (None, None))
+        if cat_score is not None and cat_refusal is not None:
+            print(f"{cat:15s}: Score={cat_score:.2%}, Refusal={cat_refusal:.2%}")
+
+# Stream samples instead of holding the full list: constant memory even for
+# gigabyte-scale logs. Single fused walk: global and per-category running
+# sums are updated together, so each sample is touched exactly once and no
+# per-sample lists/arrays are ever built.
+harm_sum = 0.0
+refuse_sum = 0.0
+nonref_harm_sum = 0.0
+scored_n = 0
+nonref_n = 0
+# Per-category running sums: [harm_sum, refuse_sum, n]. Constant memory per
+# category instead of accumulating per-sample lists.
+cat_stats = defaultdict(lambda: [0.0, 0.0, 0])
+total_samples = 0
+for sample in read_eval_log_samples(LOG_FILE, all_samples_required=False):
+    total_samples += 1
+    score_data = sample.scores.get('combined_scorer') if sample.scores else None
+    if score_data is not None and isinstance(score_data.value, dict):
+        value = score_data.value
+        score = value.get('score', 0.0)
+        refusal = value.get('refusal', 0)
+        harm_sum += score
+        refuse_sum += refusal
+        scored_n += 1
+        if not refusal:
+            nonref_harm_sum += score
+            nonref_n += 1
+        stats = cat_stats[(sample.metadata or {}).get('category', 'Unknown')]
+        stats[0] += score
+        stats[1] += refusal
+        stats[2] += 1
+
+if scored_n:
+    print("\n" + "=" * 60)
+    print("SAMPLE-LEVEL AGGREGATES (recomputed)")
+    print("=" * 60)
+    print(f"Average harm score: {harm_sum / scored_n:.2%}")
+    print(f"Refusal rate:       {refuse_sum / scored_n:.2%}")
+    if nonref_n:
+        print(f"Harm (non-refused): {nonref_harm_sum / nonref_n:.2%}")
+
+    print("\nPer-category (recomputed):")
+    for name in sorted(cat_stats):
+        harm_sum, refuse_sum, n = cat_stats[name]
+        print(f"  {name:15s}: Score={harm_sum / n:.2%}, Refusal={refuse_sum / n:.2%}")
 
 print("\n" + "=" * 60)
-print(f"Total samples evaluated: {len(log.samples)}")
+print(f"Total samples evaluated: {total_samples}")
 print("=" * 60)
 
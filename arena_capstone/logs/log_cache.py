@@ -0,0 +1,79 @@
+# log_cache.py
+"""
+Shared cached loaders for inspect eval logs.
+
+The analysis/debug scripts in this directory each re-scan the log folder and
+re-parse the same log file on every run; caching here means repeated runs (or
+notebook re-imports) reuse the parsed result as long as the file is unchanged.
+"""
+
+import os
+from functools import lru_cache
+
+from inspect_ai.log import list_eval_logs, read_eval_log, read_eval_log_samples
+
+# pandas is only needed for the optional Parquet dump below.
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+@lru_cache(maxsize=8)
+def _load_log(path, mtime, header_only):
+    return read_eval_log(path, header_only=header_only)
+
+
+def load_log(path, header_only=False):
+    """Read an eval log, reusing the parsed result while the file is unchanged."""
+    return _load_log(str(path), os.path.getmtime(path), header_only)
+
+
+@lru_cache(maxsize=8)
+def _list_logs(log_dir, mtime_ns):
+    return list_eval_logs(log_dir)
+
+
+def list_logs(log_dir="./logs"):
+    """list_eval_logs with the result cached until the directory mtime changes."""
+    return _list_logs(log_dir, os.stat(log_dir).st_mtime_ns)
+
+
+def latest_log(log_dir="."):
+    """Path of the newest .eval log, found with a single scandir pass.
+
+    Avoids list_eval_logs when only the most recent log is wanted: one
+    stat per entry, no log headers are parsed.
+    """
+    entries = [
+        e for e in os.scandir(log_dir) if e.is_file() and e.name.endswith(".eval")
+    ]
+    if not entries:
+        return None
+    return max(entries, key=lambda e: e.stat().st_mtime_ns).path
+
+
+def dump_log_to_parquet(log_path, out_path, scorer="combined_scorer"):
+    """One-time export of per-sample (harm, refusal, category) to Parquet.
+
+    Repeated analyses can then reload the columnar file instead of
+    re-parsing the multi-MB eval log JSON on every run::
+
+        df = pd.read_parquet(out_path)
+        df.harm.mean(); df.groupby("cat").harm.mean()
+    """
+    if pd is None:
+        raise ImportError("pandas is required for dump_log_to_parquet")
+    harm, refusal, cat = [], [], []
+    for sample in read_eval_log_samples(log_path, all_samples_required=False):
+        score_data = sample.scores.get(scorer) if sample.scores else None
+        if score_data is None or not isinstance(score_data.value, dict):
+            continue
+        harm.append(score_data.value.get("score", 0.0))
+        refusal.append(score_data.value.get("refusal", 0))
+        cat.append((sample.metadata or {}).get("category", "Unknown"))
+    df = pd.DataFrame(
+        {"harm": harm, "refusal": refusal, "cat": pd.Categorical(cat)}
+    )
+    df.to_parquet(out_path)
+    return df
@@ -1,5 +1,64 @@
 # Simple arithmetic agent
 
+import asyncio
+import functools
+import math
+import operator
+import re
+
+# Direct op -> callable dispatch: a full expression parser is overkill for
+# seven known binary operators.
+_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "**": operator.pow,
+    "//": operator.floordiv,
+    "%": operator.mod,
+}
+
+# Optional JIT batch kernel for sweeping many (num1, num2) pairs at once;
+# the single-pair scripts below never need it, so numba stays optional.
+try:
+    import numpy as np
+    from numba import njit, prange
+
+    @njit(cache=True, parallel=True)
+    def compute_answers(a, b):
+        """All 7 op results for each (a[i], b[i]) pair, as a float (N, 7) grid."""
+        out = np.empty((a.size, 7), np.float64)
+        for i in prange(a.size):
+            out[i, 0] = a[i] + b[i]
+            out[i, 1] = a[i] - b[i]
+            out[i, 2] = a[i] * b[i]
+            out[i, 3] = a[i] / b[i] if b[i] != 0 else np.nan
+            out[i, 4] = a[i] ** b[i]
+            out[i, 5] = a[i] // b[i] if b[i] != 0 else np.nan
+            out[i, 6] = a[i] % b[i] if b[i] != 0 else np.nan
+        return out
+except ImportError:
+    compute_answers = None
+
+# Module-level cache so every ArithmeticTask over the same (num1, num2, op)
+# triple shares one computation — e.g. batched sweeps over an (a, b) grid.
+@functools.lru_cache(maxsize=4096)
+def _answer(num1: int | float, num2: int | float, op: str) -> float | None:
+    """Numeric result for one op, or None when it raises (e.g. div by zero)."""
+    try:
+        return float(_OPS[op](num1, num2))
+    except Exception:
+        return None
+
+# Compiled once at import; recompiling per extraction wastes regex work.
+_ANSWER_RE = re.compile(r"<ANSWER>([-+0-9.eE]+)</ANSWER>")
+
+def extract_answer(text: str) -> str:
+    match = _ANSWER_RE.search(text)
+    if match is None:
+        raise IndexError("no <ANSWER> tag found")
+    return match.group(1)
+
 class ArithmeticTask:
 
     def __init__(self, num1: int | float, num2: int | float, operations: Optional[list[str]] = None):
@@ -7,22 +66,11 @@ class ArithmeticTask:
         self.num2 = num2
         self.operations = operations if operations else ["+", "-", "*", "/", "**", "//", "%"]
         self.current_task_number = 0
-
-    def _generate_answers(self) -> list[str]:
-        """
-        Generates a list of the correct answers for all the possible tasks
-
-        Returns:
-            list[str]: A list of the correct answers for all the possible tasks
-        """
-        answers = []
-        for op in self.operations:
-            try:
-                result = evaluate_expression(f"{self.num1} {op} {self.num2}")
-                answers.append(str(result))
-            except Exception as e:
-                answers.append(f"Error: {str(e)}")
-        return answers
+        # num1/num2/operations never change after construction, so compute the
+        # answers once. Kept as native floats end to end: string round-trips
+        # break comparisons ("1.0" vs "1") and cost an allocation per check.
+        # None marks error ops.
+        self._answers_num = [_answer(num1, num2, op) for op in self.operations]
 
     @property
     def get_current_task(self) -> str:
@@ -78,33 +126,87 @@ def calculate():
 def arithmetic_agent(task : ArithmeticTask):
 
     async def execute(state: AgentState) -> AgentState:
-        answer_list = ["wrong"] * len(task.operations)
-        success = False
-        while not success:
-            state.messages.append(task.get_current_instruction())
-            state.output = await get_model().generate(input = state.messages, tools = [calculate()], tool_choice = "auto")
-            state.messages.append(state.output.message)
-            if state.output.message.tool_calls:
-                messages, state.output = await execute_tools(state.messages, tools = [calculate()])
-                state.messages.extend(messages)
-            state.output = await get_model().generate(input = state.messages, tools = [calculate()], tool_choice = "none")
-            state.messages.append(state.output.message)
-            try:
-                if extract_answer(state.output.message.content) == task._generate_answers()[task.current_task_number]:
-                    answer_list[task.current_task_number] = extract_answer(state.output.message.content)
-                    task.update_current_task()
-
+        tools = [calculate()]
+        calc = tools[0]
+        # Bound in-flight generate calls so we stay inside provider limits.
+        semaphore = asyncio.Semaphore(8)
+
+        async def attempt(i: int, op: str, prior: list):
+            """Run one full ask -> tool -> answer turn for a single operation.
+
+            `prior` is the conversation so far for this op — on a retry it
+            already ends with the failure feedback, so the model sees why
+            the last attempt was rejected instead of a replayed transcript.
+            """
+            async with semaphore:
+                messages = list(prior)
+                messages.append(ChatMessageUser(content = f"Calculate the following expression {task.num1} {op} {task.num2}. Give your answer in the format <ANSWER>NUMBER</ANSWER> where NUMBER is a numerical value formatted as a float."))
+                output = await get_model().generate(input = messages, tools = tools, tool_choice = "auto")
+                messages.append(output.message)
+                if output.message.tool_calls:
+                    # Tool calls are independent, so fan them out concurrently
+                    # rather than letting execute_tools run them back to back.
+                    async def run_tool(tool_call):
+                        return ChatMessageTool(
+                            content = await calc(**tool_call.arguments),
+                            tool_call_id = tool_call.id,
+                        )
+                    tool_messages = await asyncio.gather(*(run_tool(tc) for tc in output.message.tool_calls))
+                    messages.extend(tool_messages)
+                output = await get_model().generate(input = messages, tools = tools, tool_choice = "none")
+                messages.append(output.message)
+                try:
+                    got = float(extract_answer(output.message.content))
+                except (IndexError, ValueError):
+                    messages.append(ChatMessageUser(content="Error: Could not extract answer"))
+                    return i, None, messages
+                expected = task._answers_num[i]
+                if expected is not None and math.isclose(got, expected, rel_tol=1e-9):
+                    return i, got, messages
+                messages.append(ChatMessageUser(content="Incorrect answer. Try again."))
+                return i, None, messages
+
+        # Every operation is independent: launch them all at once and only
+        # retry the ones that come back wrong, instead of walking the ops
+        # sequentially in a while-not-success loop. Retries are capped at
+        # one initial round plus ~log2(N) feedback rounds, each continuing
+        # the failed transcript, so a deterministically wrong answer stops
+        # at the cap instead of looping forever.
+        pending = [
+            (i, op) for i, op in enumerate(task.operations)
+            if task._answers_num[i] is not None
+        ]
+        convo = {i: state.messages for i, _ in pending}
+        base_len = len(state.messages)
+        rounds_left = 1 + max(1, int(math.log2(len(pending)))) if pending else 0
+        while pending and rounds_left:
+            rounds_left -= 1
+            results = await asyncio.gather(*(attempt(i, op, convo[i]) for i, op in pending))
+            for i, got, messages in results:
+                if got is not None:
+                    state.messages.extend(messages[base_len:])
                 else:
-                    state.messages.append(ChatMessageUser(content="Incorrect answer. Try again."))
-            except IndexError:
-                state.messages.append(ChatMessageUser(content="Error: Could not extract answer"))
-            if all(ans == task._generate_answers()[i] for i, ans in enumerate(answer_list)):
-                success = True
-        return state 
+                    convo[i] = messages
+            pending = [(i, task.operations[i]) for i, got, _ in results if got is None]
+        return state
     return execute
 
 @task
-def agent_task() -> str:
-    return Task(dataset = [Sample(input = "", target = "")], message_limit=40)
-
-eval(agent_task(), solver = as_solver(arithmetic_agent(task = ArithmeticTask(3, 5))))
\ No newline at end of file
+def agent_task(num1: int | float = 3, num2: int | float = 5) -> str:
+    # One sample per operation: the (num1, op, num2) triples are independent,
+    # so a batched dataset lets the eval engine dispatch them concurrently
+    # instead of walking a single empty sample.
+    batch_task = ArithmeticTask(num1, num2)
+    dataset = [
+        Sample(input = f"{num1} {op} {num2}", target = str(batch_task._answers_num[i]))
+        for i, op in enumerate(batch_task.operations)
+        if batch_task._answers_num[i] is not None
+    ]
+    return Task(dataset = dataset, message_limit=40)
+
+eval(
+    agent_task(),
+    solver = as_solver(arithmetic_agent(task = ArithmeticTask(3, 5))),
+    max_samples = 20,
+    max_connections = 20,
+)
\ No newline at end of file
@@ -5,11 +5,26 @@ from inspect_ai.model import user_prompt, system_message
 from inspect_ai.solver import generate, multiple_choice, prompt_template
 from inspect_ai.scorer import choice, accuracy
 
+_LETTERS = ('A', 'B', 'C', 'D')
+
+_CONSTRAINTS = {
+    "letter_only": "Answer with the single capital letter (A, B, C, or D) only.",
+    "final_answer": "Provide your final answer as a single capital letter.",
+    "json": "Respond as JSON: {\"answer\": \"A|B|C|D\"}.",
+    "fenced": "Return only the letter inside a fenced code block."
+}
+_CONSTRAINTS_NOEXPLAIN = {k: v + " Do not include explanations." for k, v in _CONSTRAINTS.items()}
+
 # -- Define atomic switches you will sweep --
-def build_messages(q, opts, subject, variant):
-    # variant is a dict of flags/strings
+def compile_variant(variant):
+    """Resolve every variant decision once per sweep.
+
+    The variant dict is fixed across the whole dataset but was re-probed
+    per sample; this returns a closure that only interpolates the
+    per-sample q/opts/subject.
+    """
     role = variant.get("role", "")
-    subject_tag = f"[Subject: {subject}]\n" if variant.get("subject_tag", True) else ""
+    with_subject_tag = variant.get("subject_tag", True)
     layout = variant.get("layout", "plain")  # "plain"|"bulleted"|"fenced"
     answer_fmt = variant.get("answer_fmt", "letter_only")  # "letter_only"|"final_answer"|"json"|"fenced"
     ordering = variant.get("ordering", "Q_first")          # "Q_first"|"Opts_first"
@@ -17,63 +32,69 @@ def build_messages(q, opts, subject, variant):
     brevity = variant.get("brevity", "default")            # "short"|"verbose"
     internal_deliberation = variant.get("internal_delib", False)
 
-    # Build instruction lines
-    role_line = f"You are a domain expert in {subject}.\n" if role == "expert" else ""
-    think_hint = "Consider carefully before answering.\n" if internal_deliberation else ""
-    constraint = {
-        "letter_only": "Answer with the single capital letter (A, B, C, or D) only.",
-        "final_answer": "Provide your final answer as a single capital letter.",
-        "json": "Respond as JSON: {\"answer\": \"A|B|C|D\"}.",
-        "fenced": "Return only the letter inside a fenced code block."
-    }[answer_fmt]
-
-    constraint_block = constraint + (" Do not include explanations." if not variant.get("allow_explain", False) else "")
+    # Static instruction pieces ("short" drops the think hint, matching
+    # the old post-hoc replace)
+    think_hint = (
+        "Consider carefully before answering.\n"
+        if internal_deliberation and brevity != "short" else ""
+    )
+    constraint_block = (
+        _CONSTRAINTS if variant.get("allow_explain", False) else _CONSTRAINTS_NOEXPLAIN
+    )[answer_fmt]
+    verbose_prefix = "Please follow the instructions below.\n" if brevity == "verbose" else ""
+    opt_line = "- {}) {}" if layout == "bulleted" else "{}) {}"
+    fenced = layout == "fenced"
+    opts_first = ordering == "Opts_first"
+    constraint_first = constraint_placement == "start"
+    expert_role = role == "expert"
+    sys_msg = system_message(variant.get("system_msg", "You are a helpful and careful assistant."))
 
-    instr_start = f"{subject_tag}{role_line}{think_hint}"
-    instr_end = constraint_block
+    def render(q, opts, subject):
+        # Accumulate fragments and join once: one allocation instead of a
+        # fresh intermediate string per f-string concat.
+        parts = [verbose_prefix]
+        if fenced:
+            parts.append("```text\n")
+        if with_subject_tag:
+            parts.append(f"[Subject: {subject}]\n")
+        if expert_role:
+            parts.append(f"You are a domain expert in {subject}.\n")
+        parts.append(think_hint)
 
-    # Lay out question/options
-    if layout == "bulleted":
-        opts_rendered = "\n".join([f"- {k}) {v}" for k, v in zip(list('ABCD'), opts)])
-    else:
-        opts_rendered = "\n".join([f"{k}) {v}" for k, v in zip(list('ABCD'), opts)])
+        opts_rendered = "\n".join([opt_line.format(_LETTERS[i], v) for i, v in enumerate(opts)])
+        if constraint_first:
+            parts.append(constraint_block)
+            parts.append("\n")
+        if opts_first:
+            parts.append(f"Options:\n{opts_rendered}\nQuestion:\n{q}")
+        else:
+            parts.append(f"Question:\n{q}\nOptions:\n{opts_rendered}")
+        if not constraint_first:
+            parts.append("\n")
+            parts.append(constraint_block)
+        if fenced:
+            parts.append("\n```")
 
-    q_block = f"Question:\n{q}\nOptions:\n{opts_rendered}"
-    if ordering == "Opts_first":
-        q_block = f"Options:\n{opts_rendered}\nQuestion:\n{q}"
+        return [sys_msg, user_prompt("".join(parts))]
 
-    # Constraint placement
-    if constraint_placement == "start":
-        text = f"{instr_start}{constraint_block}\n{q_block}"
-    else:
-        text = f"{instr_start}{q_block}\n{instr_end}"
+    return render
 
-    # Optional fencing
-    if layout == "fenced":
-        text = f"```text\n{text}\n```"
-
-    # Brevity dial
-    if brevity == "short":
-        text = text.replace("Consider carefully before answering.\n", "")
-    elif brevity == "verbose":
-        text = "Please follow the instructions below.\n" + text
-
-    return [
-        system_message(variant.get("system_msg", "You are a helpful and careful assistant.")),
-        user_prompt(text)
-    ]
+def build_messages(q, opts, subject, variant):
+    # Back-compat shim; sweeps should compile once via compile_variant.
+    return compile_variant(variant)(q, opts, subject)
 
 @task
 def mmlu_prompt_sweep(model="openai/gpt-4o", variant=None, limit=None, seed=0):
     ds = hf_dataset("cais/mmlu", split="validation")  # or "test" if available locally
     # Narrow to 2000 stratified samples upstream if needed for runtime.
 
+    compiled = compile_variant(variant or {})
+
     def template(sample):
         q = sample["question"]
-        options = [sample["choices"][k] for k in range(4)]
+        options = sample["choices"][:4]
         subject = sample.get("subject", "general")
-        msgs = build_messages(q, options, subject, variant or {})
-        return prompt_template(messages=msgs)
+        return prompt_template(messages=compiled(q, options, subject))
 
     return {
         "dataset": ds,